@@ -1,17 +1,28 @@
 import streamlit as st
 import os
 import io
-import tempfile
+import re
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos
 from gtts import gTTS
+from gtts.tts import gTTSError
+import base64
+import urllib.request
+import requests
+from requests.adapters import HTTPAdapter
 import json
+import sqlite3
+import uuid
+from collections import deque
 import google.generativeai as genai
+from google.generativeai.client import _ClientManager
 from dotenv import load_dotenv
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 # Configure page
 st.set_page_config(
     page_title="AI Career Coach pro",
@@ -19,138 +30,682 @@ st.set_page_config(
     layout="centered",
     initial_sidebar_state="expanded"
 )
+@st.cache_resource
+def _bootstrap():
+    """Read .env once per process rather than on every rerun"""
+    load_dotenv()
+    return True
+
 # Configure Google Gemini API
-def get_gemini_client():
-    """Get Gemini client with API key from environment or secrets"""
-    api_key = None
-    
+@st.cache_resource
+def _configured_api_key():
+    """Gemini API key from Streamlit secrets or the environment, looked up once"""
     # Try to get API key from Streamlit secrets first
     try:
         if hasattr(st, 'secrets') and "GEMINI_API_KEY" in st.secrets:
-            api_key = st.secrets["GEMINI_API_KEY"]
+            return st.secrets["GEMINI_API_KEY"]
     except:
         pass
     
     # Fallback to environment variable
-    if not api_key:
-        api_key = os.getenv("GEMINI_API_KEY")
-    
-    # Fallback to session state (user input)
-    if not api_key and "api_key_input" in st.session_state and st.session_state.api_key_input:
-        api_key = st.session_state.api_key_input
+    return os.getenv("GEMINI_API_KEY") or None
+
+def resolve_api_key():
+    """Configured Gemini API key, else the one entered in the sidebar"""
+    return _configured_api_key() or st.session_state.get("api_key_input") or None
+
+def get_gemini_client():
+    """Get Gemini client with API key from environment or secrets"""
+    api_key = resolve_api_key()
     
     if not api_key:
         return None
-        
-    genai.configure(api_key=api_key)
+    
+    # Warm the key's client so the first request doesn't pay for building it
+    _generative_client(api_key)
     return genai
 
-def call_ai(prompt, system=None, model="gemini-1.5-flash"):
+# Clients and models are cached per API key; on a public deployment every
+# distinct sidebar key would otherwise hold its channel until the process exits
+CLIENT_CACHE_TTL = 3600
+CLIENT_CACHE_MAX_KEYS = 16
+
+@st.cache_resource(ttl=CLIENT_CACHE_TTL, max_entries=CLIENT_CACHE_MAX_KEYS, show_spinner=False)
+def _generative_client(api_key):
     """
-    Call Google Gemini API for AI responses
+    One Gemini service client, with its connection pool, per API key for the
+    whole process. genai.configure() is global, so sessions using different
+    keys would otherwise rebuild and swap each other's client.
+    _ClientManager is private SDK API; requirements.txt pins google-generativeai
+    to the 0.8 series it was written against.
+    """
+    manager = _ClientManager()
+    # gRPC keeps one long-lived HTTP/2 channel per client and multiplexes every
+    # request over it, so concurrent calls share a single TLS handshake
+    manager.configure(api_key=api_key, transport="grpc")
+    return manager.make_client("generative")
+
+# One model per system prompt (plus the bare API probe) for each key
+@st.cache_resource(ttl=CLIENT_CACHE_TTL, max_entries=8 * CLIENT_CACHE_MAX_KEYS, show_spinner=False)
+def _model(name, api_key, system=None):
+    """
+    GenerativeModel reused across reruns, bound to the client for its API key.
+    The system prompt goes in as a system instruction rather than prompt text.
+    """
+    model = genai.GenerativeModel(name, system_instruction=system)
+    model._client = _generative_client(api_key)
+    return model
+
+# Responses are reused for an hour; identical form submissions and quick-topic
+# clicks then skip the Gemini round-trip entirely
+RESPONSE_CACHE_TTL = 3600
+RESPONSE_CACHE_MAX_ENTRIES = 256
+# Responses also go to the ai_cache table so they survive restarts
+DISK_CACHE_TTL = 86400
+
+@st.cache_resource(show_spinner=False)
+def _response_cache():
+    """Process-wide LRU of Gemini responses, shared by every session"""
+    return threading.Lock(), OrderedDict()
+
+def _prompt_key(prompt, system, model, **settings):
+    """Hash a request; whitespace is collapsed so re-indented prompts still match"""
+    normalized = " ".join(f"{system or ''}\n{prompt}".split())
+    options = json.dumps({k: v for k, v in settings.items() if v is not None}, sort_keys=True)
+    return hashlib.sha256(f"{model}\n{options}\n{normalized}".encode("utf-8")).hexdigest()
+
+def _memory_put(key, text, stored_at):
+    """Insert into the in-memory LRU, evicting the oldest entries past the limit"""
+    lock, entries = _response_cache()
+    with lock:
+        entries[key] = (stored_at, text)
+        entries.move_to_end(key)
+        while len(entries) > RESPONSE_CACHE_MAX_ENTRIES:
+            entries.popitem(last=False)
+
+def _cache_get(key):
+    """Return a cached response from memory, then disk; None when missing or expired"""
+    lock, entries = _response_cache()
+    with lock:
+        entry = entries.get(key)
+        if entry is not None:
+            stored_at, text = entry
+            if time.time() - stored_at <= RESPONSE_CACHE_TTL:
+                entries.move_to_end(key)
+                return text
+            del entries[key]
+    
+    db_lock, conn = get_db()
+    with db_lock:
+        row = conn.execute(
+            "SELECT response, created_at FROM ai_cache WHERE key = ? AND created_at > ?",
+            (key, time.time() - DISK_CACHE_TTL)
+        ).fetchone()
+    if row is None:
+        return None
+    _memory_put(key, row[0], time.time())
+    return row[0]
+
+def _cache_put(key, text):
+    """Store a response in memory and on disk, evicting the least recently used entries"""
+    now = time.time()
+    _memory_put(key, text, now)
+    db_lock, conn = get_db()
+    with db_lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO ai_cache (key, response, created_at) VALUES (?, ?, ?)",
+            (key, text, now)
+        )
+
+def clear_response_cache():
+    """Drop every cached Gemini response, in memory and on disk"""
+    lock, entries = _response_cache()
+    with lock:
+        entries.clear()
+    db_lock, conn = get_db()
+    with db_lock, conn:
+        conn.execute("DELETE FROM ai_cache")
+
+# Gemini requests in flight at once across all sessions, streamed or not, to
+# stay inside the per-key rate limit when fan-outs and prefetches overlap
+GEMINI_MAX_CONCURRENCY = 5
+
+@st.cache_resource(show_spinner=False)
+def _gemini_slots():
+    """Process-wide semaphore bounding concurrent Gemini requests"""
+    return threading.BoundedSemaphore(GEMINI_MAX_CONCURRENCY)
+
+NO_API_KEY_ERROR = "Error: No API key configured. Please add GEMINI_API_KEY to your environment or enter it in the sidebar."
+
+def _generation_config(response_schema=None, max_tokens=2000, temperature=0.7):
+    """Sampling settings shared by blocking and streaming calls"""
+    if response_schema:
+        # Constrain the reply to JSON matching the schema
+        return genai.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            response_mime_type="application/json",
+            response_schema=response_schema,
+        )
+    return genai.GenerationConfig(
+        temperature=temperature,
+        max_output_tokens=max_tokens,
+    )
+
+def _generate(prompt, system=None, model="gemini-1.5-flash", response_schema=None, api_key=None,
+              max_tokens=2000, temperature=0.7):
+    """Blocking, cached Gemini call; raises on failure and never touches session state"""
+    cache_key = _prompt_key(prompt, system, model, response_schema=response_schema,
+                            max_tokens=max_tokens, temperature=temperature)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+    
+    model_instance = _model(model, api_key, system)
+    
+    # Generate response
+    with _gemini_slots():
+        response = model_instance.generate_content(
+            prompt,
+            generation_config=_generation_config(response_schema, max_tokens, temperature)
+        )
+    
+    if not response.text:
+        return "No response generated"
+    
+    if response_schema:
+        # A reply cut off at max_tokens or otherwise malformed would be served
+        # from the cache for a day, so only valid JSON is kept
+        try:
+            json.loads(response.text)
+        except ValueError:
+            return response.text
+    
+    _cache_put(cache_key, response.text)
+    return response.text
+
+def call_ai(prompt, system=None, model="gemini-1.5-flash", response_schema=None, max_tokens=2000, temperature=0.7):
+    """
+    Call Google Gemini API for AI responses.
+    With response_schema the reply is a JSON string matching that schema.
+    Generation time grows with output length, so size max_tokens to the task.
     """
     try:
         client = get_gemini_client()
         
         if not client:
-            return "Error: No API key configured. Please add GEMINI_API_KEY to your environment or enter it in the sidebar."
+            return NO_API_KEY_ERROR
         
-        # Prepare the full prompt
-        if system:
-            full_prompt = f"{system}\n\n{prompt}"
-        else:
-            full_prompt = prompt
-        
-        # Create the model
-        model_instance = genai.GenerativeModel(model)
+        return _generate(prompt, system, model, response_schema, resolve_api_key(),
+                         max_tokens=max_tokens, temperature=temperature)
         
-        # Generate response
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+def in_script_ctx(fn):
+    """
+    Wrap fn to run on a worker thread under the calling script's context, so
+    the st.cache_* functions it reaches don't log a missing ScriptRunContext.
+    Call this on the script thread; pool threads are reused, so every task
+    attaches its own context. With a context a cache spinner would draw on the
+    page from the worker, so the cached helpers workers reach set
+    show_spinner=False.
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    
+    def run(*args, **kwargs):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args, **kwargs)
+    
+    return run
+
+def call_ai_many(prompts, system=None, model="gemini-1.5-flash", max_workers=GEMINI_MAX_CONCURRENCY, max_tokens=2000, temperature=0.7):
+    """
+    Call Gemini for several independent prompts concurrently.
+    Returns the responses in prompt order, each like call_ai's result.
+    """
+    # Resolve the API key here: worker threads have no access to session state
+    if not get_gemini_client():
+        return [NO_API_KEY_ERROR] * len(prompts)
+    api_key = resolve_api_key()
+    
+    def worker(prompt):
+        try:
+            return _generate(prompt, system, model, api_key=api_key,
+                             max_tokens=max_tokens, temperature=temperature)
+        except Exception as e:
+            return f"Error: {str(e)}"
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(prompts)))) as pool:
+        return list(pool.map(in_script_ctx(worker), prompts))
+
+def call_ai_stream(prompt, system=None, model="gemini-1.5-flash", api_key=None, max_tokens=2000, temperature=0.7):
+    """
+    Yield a Gemini response chunk by chunk as it is generated.
+    Cached responses are yielded in one piece; errors are raised.
+    """
+    cache_key = _prompt_key(prompt, system, model, max_tokens=max_tokens, temperature=temperature)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    model_instance = _model(model, api_key, system)
+    
+    # The slot is held until the stream is exhausted: the request is in flight
+    # until the last chunk arrives
+    with _gemini_slots():
         response = model_instance.generate_content(
-            full_prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=2000,
-            )
+            prompt,
+            stream=True,
+            generation_config=_generation_config(max_tokens=max_tokens, temperature=temperature)
         )
         
-        return response.text if response.text else "No response generated"
-        
+        chunks = []
+        for chunk in response:
+            if not chunk.parts:
+                continue
+            chunks.append(chunk.text)
+            yield chunk.text
+    
+    if chunks:
+        _cache_put(cache_key, "".join(chunks))
+
+def stream_ai(prompt, system=None, model="gemini-1.5-flash", max_tokens=2000, temperature=0.7):
+    """Render a Gemini response while it streams in and return the full text"""
+    if not get_gemini_client():
+        return NO_API_KEY_ERROR
+    
+    placeholder = st.empty()
+    try:
+        with placeholder:
+            text = st.write_stream(
+                call_ai_stream(prompt, system, model, resolve_api_key(), max_tokens, temperature)
+            )
+    except Exception as e:
+        text = f"Error: {str(e)}"
+    # The caller renders the final text from session state
+    placeholder.empty()
+    return text or "No response generated"
+
+def _api_key_fingerprint(api_key):
+    """Stable, non-reversible stand-in for an API key in cache keys"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+# A live round-trip (the response cache would hide a revoked key), but
+# st.cache_data is shared by every session, so each key is probed at most
+# once per five minutes across the whole server
+@st.cache_data(ttl=300, show_spinner=False)
+def _test_api(key_fingerprint, _api_key, model="gemini-1.5-flash"):
+    """Send a short hello to Gemini; raises on failure so errors aren't cached"""
+    with _gemini_slots():
+        response = _model(model, _api_key).generate_content(
+            "Say hello in a friendly, professional way.",
+            generation_config=_generation_config(max_tokens=100)
+        )
+    return response.text
+
+def test_api_connection():
+    """Check the API key with a real request; returns the reply or an "Error: ..." string"""
+    api_key = resolve_api_key()
+    if not api_key:
+        return NO_API_KEY_ERROR
+    try:
+        return _test_api(_api_key_fingerprint(api_key), api_key)
     except Exception as e:
         return f"Error: {str(e)}"
 
+# Chat history is written to SQLite; only the most recent turns are kept in
+# session state, and rows older than the retention window are pruned as new
+# turns are written
+DB_PATH = "coach.db"
+CHAT_HISTORY_RETENTION_DAYS = 7
+CHAT_MEMORY_LIMIT = 20
+CHAT_VISIBLE_TURNS = 10
+
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """Process-wide SQLite connection (WAL mode) and the lock serializing its use"""
+    # Read here, not at import, so a COACH_DB_PATH from .env is honoured
+    conn = sqlite3.connect(os.getenv("COACH_DB_PATH", DB_PATH), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS chat_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS idx_chat_history_session_id ON chat_history(session_id, id);
+        
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+    """)
+    # Expired rows are never read again; drop them once per process
+    with conn:
+        conn.execute("DELETE FROM ai_cache WHERE created_at <= ?", (time.time() - DISK_CACHE_TTL,))
+    return threading.Lock(), conn
+
+def get_session_id():
+    """Stable identifier for this browser session's stored history"""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+def load_chat_history(limit=CHAT_MEMORY_LIMIT, offset=0):
+    """Return up to limit turns, skipping the offset newest ones, oldest first"""
+    lock, conn = get_db()
+    with lock:
+        rows = conn.execute(
+            "SELECT question, answer FROM chat_history WHERE session_id = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+            (get_session_id(), limit, offset)
+        ).fetchall()
+    return rows[::-1]
+
+def count_chat_turns():
+    """Number of chat turns stored for this session"""
+    lock, conn = get_db()
+    with lock:
+        return conn.execute(
+            "SELECT COUNT(*) FROM chat_history WHERE session_id = ?", (get_session_id(),)
+        ).fetchone()[0]
+
+def init_chat_history():
+    """Bounded in-memory view of the chat; older turns stay on disk"""
+    st.session_state.chat_history = deque(load_chat_history(), maxlen=CHAT_MEMORY_LIMIT)
+
+def add_chat_turn(question, answer):
+    """Persist a chat turn and append it to the in-memory history"""
+    lock, conn = get_db()
+    with lock, conn:
+        conn.execute(
+            "INSERT INTO chat_history (session_id, question, answer) VALUES (?, ?, ?)",
+            (get_session_id(), question, answer)
+        )
+        # Pruned on write so a long-running process doesn't keep stale turns
+        conn.execute(
+            "DELETE FROM chat_history WHERE created_at <= datetime('now', ?)",
+            (f"-{CHAT_HISTORY_RETENTION_DAYS} days",)
+        )
+    st.session_state.chat_history.append((question, answer))
+    # Jump back to the newest page so the new answer is visible
+    st.session_state.chat_offset = 0
+
+def clear_chat_history():
+    """Delete this session's chat history from disk and memory"""
+    lock, conn = get_db()
+    with lock, conn:
+        conn.execute("DELETE FROM chat_history WHERE session_id = ?", (get_session_id(),))
+    st.session_state.chat_history = deque(maxlen=CHAT_MEMORY_LIMIT)
+    st.session_state.chat_offset = 0
+
+def save_interview_answer(index, answer):
+    """Record the answer to interview question `index`"""
+    st.session_state.interview_answers[f"answer_{index}"] = answer
+
+def clear_interview_answers():
+    """Forget this session's interview answers"""
+    st.session_state.interview_answers = {}
+
+# Unicode TTF used for PDFs; PDF_FONT_PATH or the first existing path wins
+# (see packages.txt)
+PDF_FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+]
+# DejaVu has no CJK glyphs; fpdf2 falls back to this font for characters it
+# lacks (PDF_FALLBACK_FONT_PATH or the first existing path, see packages.txt)
+PDF_FALLBACK_FONT_PATHS = [
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "/usr/share/fonts/google-droid-sans-fonts/DroidSansFallbackFull.ttf",
+]
+
+# Common Unicode characters the core PDF fonts (latin-1) can't encode,
+# replaced in a single str.translate pass when no TTF font is available
+_PDF_TEXT_TABLE = str.maketrans({
+    '\r': None,
+    '\u2013': '-',       # en-dash
+    '\u2014': '-',       # em-dash
+    '\u2018': "'",       # left single quote
+    '\u2019': "'",       # right single quote
+    '\u201C': '"',       # left double quote
+    '\u201D': '"',       # right double quote
+    '\u2022': '\u00b7',  # bullet point -> middle dot
+})
+
+@st.cache_resource
+def _pdf_font_path():
+    """Resolve the Unicode TTF once per process; None means fall back to core Arial"""
+    for path in [os.getenv("PDF_FONT_PATH"), *PDF_FONT_PATHS]:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+@st.cache_resource
+def _pdf_fallback_font_path():
+    """Resolve the CJK fallback TTF once per process; None means no fallback"""
+    for path in [os.getenv("PDF_FALLBACK_FONT_PATH"), *PDF_FALLBACK_FONT_PATHS]:
+        if path and os.path.exists(path):
+            return path
+    return None
+
+# Streamlit re-executes the script on every interaction; keying on the text
+# means an unchanged document is laid out once, not once per rerun
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _build_pdf(text):
+    """Lay out text as a PDF and return its bytes; raises on failure"""
+    # fpdf2 pulls in Pillow and fontTools; only pay for that on the first export
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+    
+    pdf = FPDF()
+    # The font is registered per document: fpdf2 subsets the parsed font in
+    # place on output, so a shared pre-registered FPDF can't be reused
+    font_path = _pdf_font_path()
+    if font_path:
+        pdf.add_font("DejaVu", "", font_path)
+        font_family = "DejaVu"
+    else:
+        font_family = "Arial"
+    pdf.add_page()
+    pdf.set_font(font_family, size=10)
+    
+    # Clean the text and split into lines; core fonts need Unicode punctuation replaced
+    if font_family == "Arial":
+        clean_text = text.translate(_PDF_TEXT_TABLE).strip()
+    else:
+        clean_text = text.replace('\r', '').strip()
+        # The fallback font is several MB to parse, so only load it when the
+        # text has characters from the CJK blocks onwards
+        fallback_path = _pdf_fallback_font_path()
+        if fallback_path and any(ord(c) >= 0x2E80 for c in clean_text):
+            pdf.add_font("Fallback", "", fallback_path)
+            pdf.set_fallback_fonts(["Fallback"])
+    lines = clean_text.split('\n')
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            pdf.ln(3)  # Add some space for empty lines
+            continue
+            
+        # multi_cell wraps on measured glyph widths, so long lines fit the page
+        pdf.multi_cell(w=0, h=5, text=line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    
+    # fpdf2 returns the document as a bytearray; dest='S' is deprecated
+    return bytes(pdf.output())
+
 def generate_pdf(text, filename="document.pdf"):
     """Generate PDF from text content"""
     try:
         if not text or not text.strip():
             return None
-            
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=10)
-        
-        # Clean the text and split into lines, handle Unicode characters
-        clean_text = text.replace('\r', '').strip()
-        # Replace common Unicode characters that cause issues
-        clean_text = clean_text.replace('\u2013', '-')  # en-dash
-        clean_text = clean_text.replace('\u2014', '-')  # em-dash
-        clean_text = clean_text.replace('\u2018', "'")  # left single quote
-        clean_text = clean_text.replace('\u2019', "'")  # right single quote
-        clean_text = clean_text.replace('\u201C', '"')  # left double quote
-        clean_text = clean_text.replace('\u201D', '"')  # right double quote
-        clean_text = clean_text.replace('\u2022', '•')  # bullet point
-        lines = clean_text.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                pdf.ln(3)  # Add some space for empty lines
-                continue
-                
-            # Handle long lines by wrapping them
-            if len(line) > 80:
-                words = line.split(' ')
-                current_line = ""
-                for word in words:
-                    if len(current_line + word + " ") < 80:
-                        current_line += word + " "
-                    else:
-                        if current_line.strip():
-                            pdf.cell(0, 5, current_line.strip(), ln=True)
-                        current_line = word + " "
-                if current_line.strip():
-                    pdf.cell(0, 5, current_line.strip(), ln=True)
-            else:
-                pdf.cell(0, 5, line, ln=True)
-        
-        # Return PDF as bytes
-        pdf_output = pdf.output(dest='S')
-        if isinstance(pdf_output, str):
-            return pdf_output.encode('latin-1', errors='replace')
-        else:
-            return bytes(pdf_output)
+        return _build_pdf(text)
     except Exception as e:
         st.error(f"PDF generation error: {str(e)}")
         return None
 
+def content_digest(content):
+    """Short hash that stays the same for the same text across reruns"""
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=8).hexdigest()
+
+# More than any one page renders at once: a chat page (CHAT_VISIBLE_TURNS) or
+# an interview's feedback (up to 10 questions plus the overall assessment),
+# so a rerun never evicts a PDF it is about to show
+SESSION_PDF_CACHE_MAX_ENTRIES = 24
+
+def session_pdf(content, content_type="document"):
+    """
+    PDF bytes for content, built at most once per session. utility_buttons
+    renders on every rerun (e.g. each 👍/👎 click), so the bytes are kept in
+    session state keyed by a hash of the content, least recently used first out.
+    """
+    pdf_cache = st.session_state.setdefault("pdf_cache", OrderedDict())
+    key = content_digest(content)
+    if key not in pdf_cache:
+        pdf_bytes = generate_pdf(content, f"{content_type}.pdf")
+        if not pdf_bytes:
+            return None
+        pdf_cache[key] = pdf_bytes
+        while len(pdf_cache) > SESSION_PDF_CACHE_MAX_ENTRIES:
+            pdf_cache.popitem(last=False)
+    pdf_cache.move_to_end(key)
+    return pdf_cache[key]
+
+@st.cache_resource(show_spinner=False)
+def _http():
+    """HTTPS connection pool shared by every TTS request in the process"""
+    # gTTS skips certificate checks for proxies; silence urllib3 as it does
+    requests.packages.urllib3.disable_warnings(
+        requests.packages.urllib3.exceptions.InsecureRequestWarning
+    )
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+    return session
+
+class PooledTTS(gTTS):
+    """
+    gTTS opens a fresh requests.Session for every request, paying a TLS
+    handshake each time. This sends through the shared pool instead.
+    """
+    
+    def stream(self):
+        for pr in self._prepare_requests():
+            try:
+                # Same request options as gTTS.stream
+                r = _http().send(
+                    request=pr,
+                    verify=False,
+                    proxies=urllib.request.getproxies(),
+                    timeout=self.timeout,
+                )
+                r.raise_for_status()
+            except requests.exceptions.HTTPError:
+                raise gTTSError(tts=self, response=r)
+            except requests.exceptions.RequestException:
+                raise gTTSError(tts=self)
+            
+            for line in r.iter_lines(chunk_size=1024):
+                decoded_line = line.decode("utf-8")
+                if "jQ1olc" in decoded_line:
+                    audio_search = re.search(r'jQ1olc","\[\\"(.*)\\"]', decoded_line)
+                    if not audio_search:
+                        raise gTTSError(tts=self, response=r)
+                    yield base64.b64decode(audio_search.group(1).encode("ascii"))
+
+# Seconds to wait on Google's TTS endpoint; gTTS waits forever by default,
+# which would pin a shared pool thread on a hung request
+TTS_TIMEOUT = 15
+
+# Synthesized MP3s are also kept on disk, least recently used evicted past the cap
+TTS_CACHE_DIR = ".tts_cache"
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+def _tts_cache_path(text, lang="en", tld="com"):
+    """Disk cache location for one utterance, keyed on the text and voice"""
+    digest = hashlib.sha1(f"{text}|{lang}|{tld}".encode("utf-8")).hexdigest()
+    return os.path.join(TTS_CACHE_DIR, f"{digest}.mp3")
+
+def _prune_tts_cache():
+    """Delete the least recently used MP3s until the cache fits its size cap"""
+    try:
+        files = [entry for entry in os.scandir(TTS_CACHE_DIR) if entry.name.endswith(".mp3")]
+        stats = sorted(((entry.stat(), entry.path) for entry in files), key=lambda item: item[0].st_mtime)
+    except OSError:
+        return
+    total = sum(stat.st_size for stat, _ in stats)
+    for stat, path in stats:
+        if total <= TTS_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            # Another thread got there first
+            pass
+        total -= stat.st_size
+
+# Keyed on the text itself, so replaying the same resume, letter or question
+# costs a dict lookup instead of another trip to Google
+@st.cache_data(ttl=86400, max_entries=512, show_spinner=False)
+def _synthesize_segment(sentence):
+    """Synthesize one sentence to MP3 bytes, reusing the disk cache when possible"""
+    path = _tts_cache_path(sentence)
+    try:
+        with open(path, "rb") as f:
+            audio = f.read()
+        # Reads count as use for LRU eviction
+        os.utime(path)
+        return audio
+    except OSError:
+        pass
+    
+    buf = io.BytesIO()
+    PooledTTS(text=sentence, lang='en', slow=False, timeout=TTS_TIMEOUT).write_to_fp(buf)
+    audio = buf.getvalue()
+    
+    try:
+        os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+        # Write then rename, so concurrent readers never see a partial file
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        _prune_tts_cache()
+    except OSError:
+        # The disk cache is an optimization; a read-only filesystem just skips it
+        pass
+    return audio
+
 def generate_tts(text, filename="audio.mp3"):
-    """Generate text-to-speech audio file"""
+    """Generate text-to-speech audio bytes"""
     try:
-        tts = gTTS(text=text, lang='en', slow=False)
-        # Use temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
-            tts.save(tmp_file.name)
-            with open(tmp_file.name, "rb") as audio_file:
-                audio_bytes = audio_file.read()
-            os.unlink(tmp_file.name)  # Clean up temp file
-            return audio_bytes
+        return _synthesize_segment(text)
     except Exception as e:
         st.error(f"TTS generation error: {str(e)}")
         return None
 
+# Sentence boundaries used to split text for segmented speech synthesis
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+')
+
+def generate_tts_segments(text):
+    """
+    Yield MP3 audio for each sentence of text, in order. Sentences are
+    synthesized four at a time, so the first segment is ready long before
+    the whole text; MP3 frames can simply be concatenated afterwards.
+    """
+    # gTTS rejects text with nothing speakable in it (e.g. "---")
+    sentences = [s for s in _SENTENCE_END_RE.split(text) if re.search(r'\w', s)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield from pool.map(in_script_ctx(_synthesize_segment), sentences)
+
 def utility_buttons(content, content_type="document"):
     """Add utility buttons for copy, download, TTS, and like/dislike"""
-    # Generate unique ID based on content length and timestamp to avoid key conflicts
-    unique_id = f"{content_type}_{len(content)}_{id(content)}"
+    # Keyed on a content hash: id() changes every rerun, so widget state was lost
+    unique_id = f"{content_type}_{content_digest(content)}"
     
     col1, col2, col3, col4, col5 = st.columns(5)
     
@@ -161,7 +716,7 @@ def utility_buttons(content, content_type="document"):
             st.success("Content displayed above - select all and copy!")
     
     with col2:
-        pdf_bytes = generate_pdf(content, f"{content_type}.pdf")
+        pdf_bytes = session_pdf(content, content_type)
         if pdf_bytes:
             st.download_button(
                 label="⬇️ PDF",
@@ -176,10 +731,28 @@ def utility_buttons(content, content_type="document"):
     
     with col3:
         if st.button("🔊 TTS", key=f"tts_{unique_id}", help="Text to Speech"):
+            segments = []
+            player = st.empty()
             with st.spinner("Generating audio..."):
-                audio_bytes = generate_tts(content)
-                if audio_bytes:
-                    st.audio(audio_bytes, format="audio/mp3")
+                try:
+                    for segment in generate_tts_segments(content):
+                        if not segments:
+                            # Start playing the opening sentence while the rest is synthesized
+                            player.audio(segment, format="audio/mp3", autoplay=True)
+                            started = time.monotonic()
+                        segments.append(segment)
+                except Exception as e:
+                    player.empty()
+                    st.error(f"TTS generation error: {str(e)}")
+                    segments = []
+                if segments:
+                    audio_bytes = b"".join(segments)
+                    if len(segments) > 1:
+                        # Replace the opening sentence's player with the full track, picking
+                        # up about where it has got to (gTTS MP3s are 32 kbit/s, so the
+                        # first segment lasts len / 4000 seconds)
+                        resume_at = int(min(time.monotonic() - started, len(segments[0]) / 4000))
+                        player.audio(audio_bytes, format="audio/mp3", start_time=resume_at, autoplay=True)
                     st.download_button(
                         label="💾 Save MP3",
                         data=audio_bytes,
@@ -202,6 +775,257 @@ def utility_buttons(content, content_type="document"):
             st.session_state[f"dislikes_{content_type}"] += 1
             st.info("Feedback noted 👎")
 
+# System instructions, one per feature; each maps to one cached GenerativeModel
+RESUME_SYSTEM_PROMPT = "You are an expert resume writer and career counselor with experience across all industries and career fields."
+COVER_LETTER_SYSTEM_PROMPT = "You are a professional career advisor and expert cover letter writer with extensive experience helping candidates across all industries secure interviews."
+CAREER_PACKAGE_SYSTEM_PROMPT = "You are an expert resume writer, cover letter writer and interview coach with experience across all industries and career fields."
+CAREER_ADVICE_SYSTEM_PROMPT = "You are an experienced career counselor and coach with expertise across all industries. Provide thoughtful, practical career advice based on current best practices and market trends."
+INTERVIEW_QUESTIONS_SYSTEM_PROMPT = "You are an experienced HR professional and interviewer. Create realistic, relevant interview questions that help assess candidates effectively."
+INTERVIEW_FEEDBACK_SYSTEM_PROMPT = "You are an experienced interview coach and HR professional. Provide detailed, constructive feedback to help candidates improve their interview performance."
+
+# Prompt templates, dedented so indentation isn't sent (and billed) as tokens
+CAREER_PACKAGE_PROMPT = """\
+Prepare a complete job application package for this candidate:
+
+{profile_text}
+
+Return a JSON object with these keys:
+- "resume": a professional, ATS-friendly, one-page resume in markdown with sections: Professional Summary, Skills, Experience (reverse chronological), Education, and Certifications/Awards. Tailor it to the target job, use bullet points for achievements and quantify results where possible. 400-600 words.
+- "cover_letter": a compelling cover letter for the target job in business letter format, connecting the candidate's background to the job requirements, ending with a confident call to action. Infer the company and position from the job description. 250-350 words.
+- "interview_questions": a list of 5 realistic interview questions for the target job, mixing behavioral and role-specific questions.
+"""
+
+COVER_LETTER_DRAFT_PROMPT = """\
+Write a compelling cover letter for {name} applying for the job below.
+Infer the company and position from the job description.
+
+Job Description: {target_job}
+
+Candidate Experience: {experience}
+Candidate Skills: {skills}
+
+Connect the candidate's background to the job requirements, include specific examples,
+and end with a confident call to action. Use proper business letter structure. 250-350 words.
+"""
+
+RESUME_PROMPT = """\
+Generate a professional, ATS-friendly resume for {name}. Use the following information:
+
+Personal Info:
+- Email: {email}
+- Phone: {phone}
+- Address: {address}
+- LinkedIn: {linkedin}
+
+Education: {education}
+Skills: {skills}
+Experience: {experience}
+Certifications: {certifications}
+
+Target Job: {target_job}
+Template Style: {template}
+
+Create a professional, one-page resume suitable for any career field with sections: Professional Summary, Skills, Experience (reverse chronological), Education, and Certifications/Awards.
+Tailor the content to match the target job description regardless of industry (business, healthcare, education, arts, engineering, etc.).
+Use bullet points for achievements, quantify results where possible, and highlight relevant coursework, projects, internships, or volunteer work if applicable.
+Keep it professional, concise, and ATS-friendly for all career fields. Word count: 400-600 words.
+"""
+
+COVER_LETTER_PROMPT = """\
+Write a compelling cover letter for {name} applying for the {position} position at {company}.
+
+Applicant Details:
+- Name: {name}
+- Target Company: {company}
+- Position: {position}
+- Hiring Manager: {hiring_manager}
+- Experience Level: {experience_level}
+- Desired Tone: {tone}
+
+Job Description: {job_description}
+
+Candidate Background: {background}
+
+Company Interest: {why_company}
+
+Create a professional cover letter that:
+1. Opens with a strong hook that demonstrates knowledge of the company
+2. Clearly connects the candidate's background to the job requirements
+3. Shows genuine enthusiasm for the role and company
+4. Includes specific examples and achievements
+5. Ends with a confident call to action
+6. Maintains the requested tone throughout
+7. Is concise (250-350 words)
+
+Format with proper business letter structure including header, date, and professional closing.
+"""
+
+CAREER_ADVICE_PROMPT = """\
+Career question: {user_question}
+
+Please provide comprehensive, actionable career advice that:
+1. Directly addresses the question
+2. Provides specific, practical steps
+3. Includes relevant examples or scenarios
+4. Considers current job market trends
+5. Offers multiple perspectives when appropriate
+6. Is encouraging and supportive in tone
+
+Make the advice detailed but easy to understand and implement.
+"""
+
+INTERVIEW_QUESTIONS_PROMPT = """\
+Generate {num_questions} interview questions for a {position} position at {company_phrase}.
+
+Interview Details:
+- Position: {position}
+- Company: {company}
+- Experience Level: {experience_level}
+- Industry: {industry}
+- Interview Type: {interview_type}
+- Job Description: {job_description}
+
+Create a mix of questions appropriate for the role and experience level:
+- Include both behavioral and technical questions (as relevant)
+- Ensure questions are realistic and commonly asked
+- Vary difficulty based on experience level
+- Make questions specific to the role and industry when possible
+
+Format as a numbered list with each question on a new line.
+"""
+
+INTERVIEW_FEEDBACK_PROMPT = """\
+Provide detailed feedback on this mock interview performance:
+
+{interview_summary}
+
+Return a JSON object with:
+- "overall": an overall performance assessment, recurring strengths and areas for improvement, and body language and communication tips
+- "per_question": one entry per question, with "q_index" (the question number), "strengths" demonstrated in the answer, "improvements" with specific suggestions for a better answer, and "follow_ups" the candidate should be prepared for
+
+Provide constructive, encouraging feedback that helps the candidate improve.
+"""
+
+# A numbered line such as "1. ...", "2) ..." or "Q3: ...", capturing the text
+_QUESTION_RE = re.compile(r'(?m)^[ \t]*(?:\d+[.)]|Q\d+[:.])[ \t]*(\S.*?)\s*$')
+
+def parse_questions(questions_text):
+    """Extract the questions from a numbered list returned by Gemini"""
+    return _QUESTION_RE.findall(questions_text)
+
+def start_interview(questions):
+    """Begin a new mock interview with the given questions"""
+    st.session_state.interview_questions = questions
+    st.session_state.current_question_index = 0
+    clear_interview_answers()
+    
+    # Synthesize the questions while the candidate reads, so Read Aloud is instant
+    pool = _background_pool()
+    synthesize = in_script_ctx(_synthesize_segment)
+    st.session_state.question_audio = {q: pool.submit(synthesize, q) for q in questions}
+
+def question_audio(question):
+    """Audio for an interview question, waiting on its background synthesis if started"""
+    future = st.session_state.get("question_audio", {}).get(question)
+    if future is not None:
+        try:
+            return future.result(timeout=TTS_TIMEOUT)
+        except Exception:
+            # Failed or still stuck: retry in the foreground, where a failure
+            # is reported to the user
+            pass
+    return generate_tts(question)
+
+CAREER_PACKAGE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "resume": {"type": "string"},
+        "cover_letter": {"type": "string"},
+        "interview_questions": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["resume", "cover_letter", "interview_questions"],
+}
+
+INTERVIEW_FEEDBACK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "overall": {"type": "string"},
+        "per_question": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "q_index": {"type": "integer"},
+                    "strengths": {"type": "string"},
+                    "improvements": {"type": "string"},
+                    "follow_ups": {"type": "string"},
+                },
+                "required": ["q_index", "strengths", "improvements", "follow_ups"],
+            },
+        },
+    },
+    "required": ["overall", "per_question"],
+}
+
+def generate_career_package(profile):
+    """
+    Draft a resume, cover letter and interview questions for one target job
+    in a single Gemini request instead of three. If the JSON reply can't be
+    parsed, each item is requested separately (concurrently).
+    Returns a dict with resume, cover_letter (text, possibly "Error: ...")
+    and interview_questions (list).
+    """
+    profile_text = "\n".join(f"- {label}: {value}" for label, value in profile.items() if value)
+    system_prompt = CAREER_PACKAGE_SYSTEM_PROMPT
+    
+    prompt = CAREER_PACKAGE_PROMPT.format(profile_text=profile_text)
+    
+    # Room for a resume (1200), a cover letter (700) and the questions (800)
+    package_json = call_ai(prompt, system_prompt, response_schema=CAREER_PACKAGE_SCHEMA,
+                           max_tokens=2700, temperature=0.4)
+    if not package_json.startswith("Error:"):
+        try:
+            package = json.loads(package_json)
+            return {
+                "resume": package["resume"],
+                "cover_letter": package["cover_letter"],
+                "interview_questions": [q.strip() for q in package["interview_questions"] if q.strip()],
+            }
+        except (ValueError, KeyError, TypeError, AttributeError):
+            pass
+    
+    # Fall back to one request per item
+    resume, cover_letter, questions_text = call_ai_many([
+        f"Write a professional, ATS-friendly, one-page resume (400-600 words) tailored to the target job for this candidate:\n\n{profile_text}",
+        f"Write a compelling cover letter (250-350 words, business letter format) for this candidate's target job. Infer the company and position from the job description.\n\n{profile_text}",
+        f"Generate 5 realistic interview questions for this candidate's target job. Format as a numbered list with each question on a new line.\n\n{profile_text}",
+    ], system_prompt, max_tokens=1200, temperature=0.4)
+    questions = [] if questions_text.startswith("Error:") else parse_questions(questions_text)
+    return {"resume": resume, "cover_letter": cover_letter, "interview_questions": questions}
+
+@st.cache_resource
+def _background_pool():
+    """Shared worker threads for speculative background requests"""
+    return ThreadPoolExecutor(max_workers=4)
+
+def prefetch_cover_letter(name, target_job, experience, skills):
+    """
+    Start drafting a cover letter from the resume inputs in the background.
+    The future is kept in session state for cover_letter_generator to offer.
+    """
+    prompt = COVER_LETTER_DRAFT_PROMPT.format(
+        name=name,
+        target_job=target_job,
+        experience=experience,
+        skills=skills,
+    )
+    system_prompt = COVER_LETTER_SYSTEM_PROMPT
+    
+    # The worker can't read session state, so resolve the key here
+    st.session_state.prefetched_cover_future = _background_pool().submit(
+        in_script_ctx(_generate), prompt, system_prompt, api_key=resolve_api_key(), max_tokens=700, temperature=0.4
+    )
+
 def resume_generator():
     st.header("📄 Resume Generator")
     st.markdown("Create an ATS-friendly resume tailored to your target career - perfect for any field of study")
@@ -226,45 +1050,85 @@ def resume_generator():
         
         template = st.selectbox("Resume Template", ["Simple", "Modern", "Minimal"])
         
+        include_package = st.checkbox(
+            "Also draft a matching cover letter and interview questions",
+            help="Generates all three in one request from your target job description"
+        )
+        
         submitted = st.form_submit_button("Generate Resume 🚀")
     
     # Handle form submission outside the form context
     if submitted:
         if not name or not email:
             st.error("Please fill in required fields (Name and Email)")
-        else:
-            with st.spinner("Generating your resume..."):
-                prompt = f"""
-                Generate a professional, ATS-friendly resume for {name}. Use the following information:
-                
-                Personal Info:
-                - Email: {email}
-                - Phone: {phone}
-                - Address: {address}
-                - LinkedIn: {linkedin}
+        elif include_package and not target_job:
+            st.error("Please add a target job description to draft the full package")
+        elif include_package:
+            with st.spinner("Generating your resume, cover letter and interview questions..."):
+                package = generate_career_package({
+                    "Name": name,
+                    "Email": email,
+                    "Phone": phone,
+                    "Address": address,
+                    "LinkedIn": linkedin,
+                    "Education": education,
+                    "Skills": skills,
+                    "Experience": experience,
+                    "Certifications": certifications,
+                    "Target Job": target_job,
+                    "Resume Template Style": template,
+                })
                 
-                Education: {education}
-                Skills: {skills}
-                Experience: {experience}
-                Certifications: {certifications}
+                if not package["resume"].startswith("Error:"):
+                    st.session_state.generated_resume = package["resume"]
+                    st.success("✅ Resume generated successfully!")
+                else:
+                    st.error(f"Failed to generate resume: {package['resume']}")
                 
-                Target Job: {target_job}
-                Template Style: {template}
+                # Never overwrite a cover letter or interview the user already has
+                if package["cover_letter"].startswith("Error:"):
+                    st.error(f"Failed to generate cover letter: {package['cover_letter']}")
+                elif st.session_state.get("generated_cover_letter"):
+                    st.info("Kept your existing cover letter; clear it in the Cover Letter section to draft a new one")
+                else:
+                    st.session_state.generated_cover_letter = package["cover_letter"]
+                    st.success("✅ Cover letter ready in the Cover Letter section")
                 
-                Create a professional, one-page resume suitable for any career field with sections: Professional Summary, Skills, Experience (reverse chronological), Education, and Certifications/Awards. 
-                Tailor the content to match the target job description regardless of industry (business, healthcare, education, arts, engineering, etc.). 
-                Use bullet points for achievements, quantify results where possible, and highlight relevant coursework, projects, internships, or volunteer work if applicable.
-                Keep it professional, concise, and ATS-friendly for all career fields. Word count: 400-600 words.
-                """
+                if not package["interview_questions"]:
+                    st.error("Failed to generate interview questions")
+                elif st.session_state.get("interview_questions"):
+                    st.info("Kept your current mock interview; start a new one after finishing it to practice these questions")
+                else:
+                    start_interview(package["interview_questions"])
+                    st.success(f"✅ {len(package['interview_questions'])} interview questions ready in the Mock Interview section")
+        else:
+            with st.spinner("Generating your resume..."):
+                prompt = RESUME_PROMPT.format(
+                    name=name,
+                    email=email,
+                    phone=phone,
+                    address=address,
+                    linkedin=linkedin,
+                    education=education,
+                    skills=skills,
+                    experience=experience,
+                    certifications=certifications,
+                    target_job=target_job,
+                    template=template,
+                )
                 
-                system_prompt = "You are an expert resume writer and career counselor with experience across all industries and career fields."
+                system_prompt = RESUME_SYSTEM_PROMPT
                 
-                resume_content = call_ai(prompt, system_prompt)
+                resume_content = stream_ai(prompt, system_prompt, max_tokens=1200, temperature=0.4)
                 
                 if not resume_content.startswith("Error:"):
                     # Store in session state to persist across reruns
                     st.session_state.generated_resume = resume_content
                     st.success("✅ Resume generated successfully!")
+                    
+                    # Users usually move on to the cover letter next: start drafting it now
+                    if target_job:
+                        prefetch_cover_letter(name, target_job, experience, skills)
                 else:
                     st.error(f"Failed to generate resume: {resume_content}")
     
@@ -285,6 +1149,25 @@ def cover_letter_generator():
     st.header("📝 Cover Letter Generator")
     st.markdown("Create compelling, personalized cover letters that match job requirements")
     
+    # Offer the draft prefetched after resume generation, if any
+    future = st.session_state.get("prefetched_cover_future")
+    if future and "generated_cover_letter" not in st.session_state:
+        if not future.done():
+            st.caption("⏳ Drafting a cover letter from your resume in the background...")
+        else:
+            try:
+                draft = future.result(timeout=0)
+            except Exception:
+                draft = None
+            if draft:
+                st.info("💡 A draft cover letter based on your resume is ready.")
+                if st.button("📥 Use Draft Cover Letter", key="use_prefetched_cover"):
+                    st.session_state.generated_cover_letter = draft
+                    del st.session_state.prefetched_cover_future
+                    st.rerun()
+            else:
+                del st.session_state.prefetched_cover_future
+    
     with st.form("cover_letter_form"):
         col1, col2 = st.columns(2)
         
@@ -311,38 +1194,21 @@ def cover_letter_generator():
             st.error("Please fill in required fields (Name, Company, Position)")
         else:
             with st.spinner("Crafting your cover letter..."):
-                prompt = f"""
-                Write a compelling cover letter for {name} applying for the {position} position at {company}.
-                
-                Applicant Details:
-                - Name: {name}
-                - Target Company: {company}
-                - Position: {position}
-                - Hiring Manager: {hiring_manager if hiring_manager else "Hiring Manager"}
-                - Experience Level: {experience_level}
-                - Desired Tone: {tone}
-                
-                Job Description: {job_description}
-                
-                Candidate Background: {background}
-                
-                Company Interest: {why_company}
+                prompt = COVER_LETTER_PROMPT.format(
+                    name=name,
+                    position=position,
+                    company=company,
+                    hiring_manager=hiring_manager or "Hiring Manager",
+                    experience_level=experience_level,
+                    tone=tone,
+                    job_description=job_description,
+                    background=background,
+                    why_company=why_company,
+                )
                 
-                Create a professional cover letter that:
-                1. Opens with a strong hook that demonstrates knowledge of the company
-                2. Clearly connects the candidate's background to the job requirements
-                3. Shows genuine enthusiasm for the role and company
-                4. Includes specific examples and achievements
-                5. Ends with a confident call to action
-                6. Maintains the requested tone throughout
-                7. Is concise (250-350 words)
+                system_prompt = COVER_LETTER_SYSTEM_PROMPT
                 
-                Format with proper business letter structure including header, date, and professional closing.
-                """
-                
-                system_prompt = "You are a professional career advisor and expert cover letter writer with extensive experience helping candidates across all industries secure interviews."
-                
-                cover_letter_content = call_ai(prompt, system_prompt)
+                cover_letter_content = stream_ai(prompt, system_prompt, max_tokens=700, temperature=0.4)
                 
                 if not cover_letter_content.startswith("Error:"):
                     # Store in session state to persist across reruns
@@ -370,12 +1236,30 @@ def career_advice_chat():
     
     # Initialize chat history
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        init_chat_history()
     
-    # Display chat history
+    # Display chat history a page of CHAT_VISIBLE_TURNS at a time; older pages come from disk
     if st.session_state.chat_history:
         st.markdown("### Conversation History:")
-        for i, (question, answer) in enumerate(st.session_state.chat_history):
+        total = count_chat_turns()
+        offset = st.session_state.get("chat_offset", 0)
+        if offset:
+            turns = load_chat_history(CHAT_VISIBLE_TURNS, offset)
+        else:
+            turns = list(st.session_state.chat_history)[-CHAT_VISIBLE_TURNS:]
+        first = total - offset - len(turns)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if first > 0 and st.button(f"⬆️ Show older ({first} more)"):
+                st.session_state.chat_offset = offset + CHAT_VISIBLE_TURNS
+                st.rerun()
+        with col2:
+            if offset and st.button("⬇️ Show newer"):
+                st.session_state.chat_offset = max(0, offset - CHAT_VISIBLE_TURNS)
+                st.rerun()
+        
+        for i, (question, answer) in enumerate(turns, start=first):
             with st.expander(f"Q{i+1}: {question[:50]}...", expanded=False):
                 st.markdown(f"**You:** {question}")
                 st.markdown(f"**AI Coach:** {answer}")
@@ -416,27 +1300,15 @@ def career_advice_chat():
         if st.button("💬 Get Advice"):
             if user_question.strip():
                 with st.spinner("Thinking..."):
-                    prompt = f"""
-                    Career question: {user_question}
-                    
-                    Please provide comprehensive, actionable career advice that:
-                    1. Directly addresses the question
-                    2. Provides specific, practical steps
-                    3. Includes relevant examples or scenarios
-                    4. Considers current job market trends
-                    5. Offers multiple perspectives when appropriate
-                    6. Is encouraging and supportive in tone
+                    prompt = CAREER_ADVICE_PROMPT.format(user_question=user_question)
                     
-                    Make the advice detailed but easy to understand and implement.
-                    """
+                    system_prompt = CAREER_ADVICE_SYSTEM_PROMPT
                     
-                    system_prompt = "You are an experienced career counselor and coach with expertise across all industries. Provide thoughtful, practical career advice based on current best practices and market trends."
-                    
-                    advice = call_ai(prompt, system_prompt)
+                    advice = stream_ai(prompt, system_prompt, max_tokens=1200, temperature=0.8)
                     
                     if not advice.startswith("Error:"):
                         # Add to chat history
-                        st.session_state.chat_history.append((user_question, advice))
+                        add_chat_turn(user_question, advice)
                         
                         # Clear quick topic
                         if "quick_topic" in st.session_state:
@@ -449,7 +1321,7 @@ def career_advice_chat():
     
     with col2:
         if st.button("🗑️ Clear Chat"):
-            st.session_state.chat_history = []
+            clear_chat_history()
             if "quick_topic" in st.session_state:
                 del st.session_state.quick_topic
             st.rerun()
@@ -492,44 +1364,23 @@ def mock_interview():
                     st.error("Please provide a position title")
                 else:
                     with st.spinner("Generating interview questions..."):
-                        prompt = f"""
-                        Generate {num_questions} interview questions for a {position} position at {company if company else "a company"}.
-                        
-                        Interview Details:
-                        - Position: {position}
-                        - Company: {company if company else "Generic Company"}
-                        - Experience Level: {experience_level}
-                        - Industry: {industry if industry else "General"}
-                        - Interview Type: {interview_type}
-                        - Job Description: {job_description if job_description else "Not provided"}
+                        prompt = INTERVIEW_QUESTIONS_PROMPT.format(
+                            num_questions=num_questions,
+                            position=position,
+                            company_phrase=company or "a company",
+                            company=company or "Generic Company",
+                            experience_level=experience_level,
+                            industry=industry or "General",
+                            interview_type=interview_type,
+                            job_description=job_description or "Not provided",
+                        )
                         
-                        Create a mix of questions appropriate for the role and experience level:
-                        - Include both behavioral and technical questions (as relevant)
-                        - Ensure questions are realistic and commonly asked
-                        - Vary difficulty based on experience level
-                        - Make questions specific to the role and industry when possible
+                        system_prompt = INTERVIEW_QUESTIONS_SYSTEM_PROMPT
                         
-                        Format as a numbered list with each question on a new line.
-                        """
-                        
-                        system_prompt = "You are an experienced HR professional and interviewer. Create realistic, relevant interview questions that help assess candidates effectively."
-                        
-                        questions_text = call_ai(prompt, system_prompt)
+                        questions_text = call_ai(prompt, system_prompt, max_tokens=800)
                         
                         if not questions_text.startswith("Error:"):
-                            # Parse questions from the response
-                            questions = []
-                            for line in questions_text.split('\n'):
-                                line = line.strip()
-                                if line and (line[0].isdigit() or line.startswith('Q')):
-                                    # Remove numbering and clean up
-                                    question = line.split('.', 1)[-1].strip()
-                                    if question:
-                                        questions.append(question)
-                            
-                            st.session_state.interview_questions = questions
-                            st.session_state.current_question_index = 0
-                            st.session_state.interview_answers = {}
+                            start_interview(parse_questions(questions_text))
                             st.rerun()
                         else:
                             st.error(f"Failed to generate questions: {questions_text}")
@@ -551,47 +1402,51 @@ def mock_interview():
             st.markdown(f"### Question {current_index + 1}")
             st.markdown(f"**{current_question}**")
             
-            # Answer input
+            # Typing inside a form doesn't rerun the script; the answer is read
+            # and saved only when one of the navigation buttons is pressed.
+            # Ctrl/Cmd+Enter would press the first button, "Previous", so it's off
             answer_key = f"answer_{current_index}"
-            user_answer = st.text_area(
-                "Your Answer:",
-                value=st.session_state.interview_answers.get(answer_key, ""),
-                height=150,
-                key=f"answer_input_{current_index}"
-            )
-            
-            col1, col2, col3 = st.columns([1, 1, 2])
-            
-            with col1:
-                if st.button("⬅️ Previous", disabled=current_index == 0):
-                    if user_answer and user_answer.strip():
-                        st.session_state.interview_answers[answer_key] = user_answer
-                    st.session_state.current_question_index -= 1
-                    st.rerun()
-            
-            with col2:
-                if current_index < total_questions - 1:
-                    if st.button("Next ➡️"):
-                        if user_answer and user_answer.strip():
-                            st.session_state.interview_answers[answer_key] = user_answer
-                            st.session_state.current_question_index += 1
-                            st.rerun()
-                        else:
-                            st.warning("Please provide an answer before proceeding")
-                else:
-                    if st.button("Finish Interview 🏁"):
+            with st.form(f"answer_form_{current_index}", border=False, enter_to_submit=False):
+                user_answer = st.text_area(
+                    "Your Answer:",
+                    value=st.session_state.interview_answers.get(answer_key, ""),
+                    height=150,
+                    key=f"answer_input_{current_index}"
+                )
+                
+                col1, col2, _ = st.columns([1, 1, 2])
+                
+                with col1:
+                    if st.form_submit_button("⬅️ Previous", disabled=current_index == 0):
                         if user_answer and user_answer.strip():
-                            st.session_state.interview_answers[answer_key] = user_answer
-                            st.session_state.current_question_index += 1
-                            st.rerun()
-                        else:
-                            st.warning("Please provide an answer before finishing")
+                            save_interview_answer(current_index, user_answer)
+                        st.session_state.current_question_index -= 1
+                        st.rerun()
+                
+                with col2:
+                    if current_index < total_questions - 1:
+                        if st.form_submit_button("Next ➡️"):
+                            if user_answer and user_answer.strip():
+                                save_interview_answer(current_index, user_answer)
+                                st.session_state.current_question_index += 1
+                                st.rerun()
+                            else:
+                                st.warning("Please provide an answer before proceeding")
+                    else:
+                        if st.form_submit_button("Finish Interview 🏁"):
+                            if user_answer and user_answer.strip():
+                                save_interview_answer(current_index, user_answer)
+                                st.session_state.current_question_index += 1
+                                st.rerun()
+                            else:
+                                st.warning("Please provide an answer before finishing")
             
-            with col3:
-                if st.button("🔊 Read Question Aloud"):
-                    audio_bytes = generate_tts(current_question)
-                    if audio_bytes:
-                        st.audio(audio_bytes, format="audio/mp3")
+            # Plain buttons can't live inside a form
+            if st.button("🔊 Read Question Aloud"):
+                with st.spinner("Generating audio..."):
+                    audio_bytes = question_audio(current_question)
+                if audio_bytes:
+                    st.audio(audio_bytes, format="audio/mp3")
         
         else:
             # Interview completed
@@ -605,32 +1460,47 @@ def mock_interview():
                     answer = st.session_state.interview_answers.get(f"answer_{i}", "No answer provided")
                     interview_summary += f"Q{i+1}: {question}\nA{i+1}: {answer}\n\n"
                 
-                feedback_prompt = f"""
-                Provide detailed feedback on this mock interview performance:
-                
-                {interview_summary}
-                
-                Please analyze:
-                1. Overall performance assessment
-                2. Strengths demonstrated in the responses
-                3. Areas for improvement
-                4. Specific suggestions for better answers
-                5. Body language and communication tips
-                6. Follow-up questions the candidate should be prepared for
-                
-                Provide constructive, encouraging feedback that helps the candidate improve.
-                """
+                feedback_prompt = INTERVIEW_FEEDBACK_PROMPT.format(interview_summary=interview_summary)
                 
-                system_prompt = "You are an experienced interview coach and HR professional. Provide detailed, constructive feedback to help candidates improve their interview performance."
+                system_prompt = INTERVIEW_FEEDBACK_SYSTEM_PROMPT
                 
-                feedback = call_ai(feedback_prompt, system_prompt)
+                # About 400 tokens per question's critique plus the overall assessment
+                feedback_json = call_ai(
+                    feedback_prompt, system_prompt,
+                    response_schema=INTERVIEW_FEEDBACK_SCHEMA,
+                    max_tokens=400 * (len(st.session_state.interview_questions) + 1)
+                )
                 
-                if not feedback.startswith("Error:"):
+                if not feedback_json.startswith("Error:"):
                     st.markdown("### Interview Feedback")
-                    st.markdown(feedback)
                     
-                    # Utility buttons for feedback
-                    utility_buttons(feedback, "interview_feedback")
+                    try:
+                        feedback = json.loads(feedback_json)
+                        overall = feedback["overall"]
+                        per_question = feedback["per_question"]
+                    except (ValueError, KeyError, TypeError):
+                        # Unparseable structured reply: show it as plain text
+                        overall, per_question = feedback_json, []
+                    
+                    st.markdown(overall)
+                    utility_buttons(overall, "interview_feedback")
+                    
+                    questions = st.session_state.interview_questions
+                    # One expander per question; a repeated q_index would reuse widget keys
+                    shown = set()
+                    for item in per_question:
+                        q_index = item.get("q_index")
+                        if not isinstance(q_index, int) or not 1 <= q_index <= len(questions) or q_index in shown:
+                            continue
+                        shown.add(q_index)
+                        item_feedback = (
+                            f"**Strengths:** {item.get('strengths', '')}\n\n"
+                            f"**Areas for improvement:** {item.get('improvements', '')}\n\n"
+                            f"**Follow-up questions to prepare for:** {item.get('follow_ups', '')}"
+                        )
+                        with st.expander(f"Q{q_index}: {questions[q_index - 1][:50]}...", expanded=False):
+                            st.markdown(item_feedback)
+                            utility_buttons(item_feedback, f"interview_feedback_q{q_index}")
                     
                     # Full interview summary
                     st.markdown("### Complete Interview Summary")
@@ -638,13 +1508,11 @@ def mock_interview():
                         st.markdown(interview_summary)
                         utility_buttons(interview_summary, "interview_summary")
                 else:
-                    st.error(f"Failed to generate feedback: {feedback}")
+                    st.error(f"Failed to generate feedback: {feedback_json}")
             
             # Reset button
             if st.button("🔄 Start New Interview"):
-                st.session_state.interview_questions = []
-                st.session_state.interview_answers = {}
-                st.session_state.current_question_index = 0
+                start_interview([])
                 st.rerun()
 
 def about_page():
@@ -722,7 +1590,7 @@ def about_page():
     client = get_gemini_client()
     if client:
         if st.button("🧪 Test API Connection"):
-            test_response = call_ai("Say hello in a friendly, professional way.")
+            test_response = test_api_connection()
             if not test_response.startswith("Error:"):
                 st.success("✅ API connection successful!")
                 st.info(f"Response: {test_response}")
@@ -731,16 +1599,24 @@ def about_page():
     else:
         st.warning("⚠️ No API key configured. Please add your Gemini API key to get started.")
 
-def main():
-    # Initialize session state variables
+def _init_state():
+    """Set up a new session's state; later reruns skip this after one lookup"""
+    if st.session_state.get("_bootstrapped"):
+        return
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
-    if "interview_questions" not in st.session_state:
-        st.session_state.interview_questions = []
-    if "interview_answers" not in st.session_state:
-        st.session_state.interview_answers = {}
-    if "current_question_index" not in st.session_state:
-        st.session_state.current_question_index = 0
+        init_chat_history()
+    defaults = {
+        "interview_questions": [],
+        "interview_answers": {},
+        "current_question_index": 0,
+    }
+    for key, value in defaults.items():
+        st.session_state.setdefault(key, value)
+    st.session_state._bootstrapped = True
+
+def main():
+    _bootstrap()
+    _init_state()
     
     # Header
     st.title("💼 AI Career Coach")
@@ -773,7 +1649,7 @@ def main():
     else:
         st.sidebar.success("✅ Gemini API configured")
         if st.sidebar.button("🧪 Test API"):
-            test_response = call_ai("Say hello in a friendly way.")
+            test_response = test_api_connection()
             if not test_response.startswith("Error:"):
                 st.sidebar.success("✅ API connection successful!")
             else:
@@ -798,6 +1674,10 @@ def main():
     elif page == "Mock Interview":
         st.sidebar.info("🎤 Practice out loud for best results")
     
+    if st.sidebar.button("🧹 Clear AI Cache", help="Forget cached responses so the next requests go to Gemini"):
+        clear_response_cache()
+        st.sidebar.success("✅ Cache cleared")
+    
     # Page routing
     if page == "Resume Generator":
         resume_generator()